@@ -1,20 +1,31 @@
 import os
-try:
-	import requests
-except ImportError:
-	requests = None
-import json
 
-try:
-	# Provide a thin wrapper to the data_processor enrich function if available
-	from utils.data_processor import enrich_transactions as _enrich_transactions
-except Exception:
-	_enrich_transactions = None
+# `requests`, `json` and `utils.data_processor` are imported on first use so
+# that importing this module (and runs that never enrich) stay cheap.
+
+
+def _load_requests():
+	"""Import `requests` lazily; returns None when it is not installed."""
+	try:
+		import requests
+	except ImportError:
+		return None
+	return requests
+
+
+def _load_enrich_transactions():
+	"""Import the real `enrich_transactions` from `utils.data_processor` lazily."""
+	try:
+		from utils.data_processor import enrich_transactions
+	except Exception:
+		return None
+	return enrich_transactions
 
 
 def fetch_all_products():
 	"""Fetch all products from DummyJSON API and return a dict keyed by product id (str)."""
 	url = "https://dummyjson.com/products?limit=100"
+	requests = _load_requests()
 	if requests is None:
 		print("✗ 'requests' not installed — cannot fetch products.")
 		return {}
@@ -43,6 +54,7 @@ def enrich_transactions(transactions, products_dict):
 	"""Wrapper that calls the real `enrich_transactions` in `utils.data_processor` if available.
 	If the internal function is not importable, returns the transactions unchanged.
 	"""
+	_enrich_transactions = _load_enrich_transactions()
 	if _enrich_transactions is None:
 		print("✗ enrich_transactions not available (utils.data_processor missing)")
 		return transactions
@@ -53,6 +65,8 @@ def save_enriched_data(enriched_transactions, path="output/enriched_transactions
 	"""Persist enriched transactions to a JSON file under `output/`.
 	Creates the `output/` directory if missing.
 	"""
+	import json
+
 	os.makedirs(os.path.dirname(path) or "output", exist_ok=True)
 	try:
 		with open(path, "w", encoding="utf-8") as f:
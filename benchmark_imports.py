@@ -0,0 +1,74 @@
+"""Import-time regression checks for the `utils` package.
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter for
+each module and fails if a module pulls in dependencies it should only load
+lazily, or if its own cumulative import time exceeds the budget.
+
+Usage: python utils/benchmark_imports.py [--runs N]
+"""
+import os
+import subprocess
+import sys
+
+# module -> (cumulative import budget in microseconds, modules that must not load)
+IMPORT_BUDGETS = {
+    'utils': (10000, ('requests', 'json', 'utils.data_processor')),
+    'utils.api_handler': (10000, ('requests', 'json', 'utils.data_processor')),
+    'utils.file_handler': (10000, ('requests', 'json')),
+    'utils.data_processor': (15000, ('requests', 'json', 'utils.validation')),
+    'utils.query_cache': (20000, ('requests', 'json', 'pickle', 'hashlib', 'utils.api_handler')),
+    'utils.report_renderer': (20000, ('json', 'csv', 'html')),
+    'utils.main': (30000, ('requests', 'json', 'pickle', 'hashlib', 'utils.api_handler', 'utils.dedup_index',
+                           'utils.customer_analytics', 'utils.report_renderer', 'utils.validation')),
+}
+
+PROJECT_ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+
+def measure_import(module):
+    """Returns ({imported module: cumulative us}, total us for `module`) from one fresh interpreter."""
+    env = dict(os.environ)
+    env['PYTHONPATH'] = PROJECT_ROOT + os.pathsep + env.get('PYTHONPATH', '')
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True, env=env, cwd=PROJECT_ROOT,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr}")
+    timings = {}
+    for line in result.stderr.splitlines():
+        # "import time:      self [us] |    cumulative | imported package"
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        timings[name.strip()] = int(cumulative)
+    return timings, timings.get(module, 0)
+
+
+def run_checks(runs=5):
+    """Checks every module in IMPORT_BUDGETS; returns True if all pass."""
+    ok = True
+    print(f"{'Module':<25} {'Best (us)':>10} {'Budget':>10}  Status")
+    for module, (budget, forbidden) in IMPORT_BUDGETS.items():
+        best = None
+        loaded = set()
+        for _ in range(runs):
+            timings, total = measure_import(module)
+            loaded.update(name for name in forbidden if name in timings)
+            best = total if best is None else min(best, total)
+        problems = []
+        if best > budget:
+            problems.append("over budget")
+        if loaded:
+            problems.append(f"eagerly imports {', '.join(sorted(loaded))}")
+        status = '✓' if not problems else '✗ ' + '; '.join(problems)
+        ok = ok and not problems
+        print(f"{module:<25} {best:>10} {budget:>10}  {status}")
+    return ok
+
+
+if __name__ == "__main__":
+    runs = 5
+    if '--runs' in sys.argv:
+        runs = int(sys.argv[sys.argv.index('--runs') + 1])
+    sys.exit(0 if run_checks(runs) else 1)
@@ -0,0 +1,288 @@
+"""Customer-level analytics built from compact, array-backed per-customer state.
+
+Each customer ID is interned once and mapped to an integer slot; everything
+else about the customer lives in parallel `array` columns indexed by that
+slot. Memory grows by about 120 bytes per customer plus the ID string,
+most of it the ID-to-slot dict and ID list (the columns take 48), against
+roughly 500 for a dict of aggregates per customer. States built over
+separate chunks can be merged.
+"""
+from array import array
+from datetime import date
+import heapq
+
+# Monthly activity is kept as a 64-bit mask relative to the first purchase month
+ACTIVITY_MONTHS = 64
+_MASK = (1 << ACTIVITY_MONTHS) - 1
+
+
+def _parse_day(value, cache):
+    """Returns (day ordinal, month index) for 'YYYY-MM-DD', memoized per string."""
+    parsed = cache.get(value)
+    if parsed is None:
+        try:
+            d = date(int(value[0:4]), int(value[5:7]), int(value[8:10]))
+        except (ValueError, TypeError):
+            parsed = False
+        else:
+            parsed = (d.toordinal(), d.year * 12 + d.month - 1)
+        cache[value] = parsed
+    return parsed
+
+
+def _month_label(month_index):
+    return f"{month_index // 12:04d}-{month_index % 12 + 1:02d}"
+
+
+class CustomerState:
+    """Per-customer aggregates stored column-wise, one slot per customer."""
+
+    def __init__(self):
+        self.slots = {}                 # customer_id -> slot
+        self.ids = []                   # slot -> customer_id
+        self.orders = array('L')
+        self.revenue = array('d')
+        self.first_day = array('l')     # date ordinals
+        self.last_day = array('l')
+        self.first_month = array('l')   # year * 12 + month - 1
+        self.activity = array('Q')      # bit i = purchased in first_month + i
+        self._dates = {}
+        self.skipped = 0
+        # slot -> months (year * 12 + month - 1) with purchases past the
+        # activity horizon; only customers active for over ACTIVITY_MONTHS have one
+        self.overflow = {}
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def truncated(self):
+        """Distinct customer purchase months past the activity horizon.
+
+        Months only ever leave the horizon (the first month can only move
+        earlier), so the count is the same for any row order or chunking.
+        """
+        return sum(map(len, self.overflow.values()))
+
+    def _drop(self, slot, high_bits, month):
+        """Records the months of `high_bits` (bit i = `month` + i) as past the horizon."""
+        months = self.overflow.setdefault(slot, set())
+        while high_bits:
+            low = high_bits & -high_bits
+            months.add(month + low.bit_length() - 1)
+            high_bits ^= low
+
+    def _slot(self, customer_id):
+        slot = self.slots.get(customer_id)
+        if slot is None:
+            slot = len(self.ids)
+            self.slots[customer_id] = slot
+            self.ids.append(customer_id)
+            self.orders.append(0)
+            self.revenue.append(0.0)
+            self.first_day.append(0)
+            self.last_day.append(0)
+            self.first_month.append(0)
+            self.activity.append(0)
+        return slot
+
+    def _record(self, slot, orders, revenue, first_day, last_day, first_month, activity, overflow=None):
+        """Folds one customer's aggregates into `slot`, aligning activity masks."""
+        if overflow:
+            self.overflow.setdefault(slot, set()).update(overflow)
+        if self.orders[slot] == 0:
+            self.first_day[slot] = first_day
+            self.last_day[slot] = last_day
+            self.first_month[slot] = first_month
+            self.activity[slot] = activity
+        else:
+            if first_day < self.first_day[slot]:
+                self.first_day[slot] = first_day
+            if last_day > self.last_day[slot]:
+                self.last_day[slot] = last_day
+            current = self.first_month[slot]
+            if first_month >= current:
+                shifted = activity << (first_month - current)
+                self.activity[slot] |= shifted & _MASK
+            else:
+                shifted = self.activity[slot] << (current - first_month)
+                self.activity[slot] = (shifted & _MASK) | activity
+                self.first_month[slot] = first_month
+            if shifted >> ACTIVITY_MONTHS:
+                self._drop(slot, shifted >> ACTIVITY_MONTHS, self.first_month[slot] + ACTIVITY_MONTHS)
+        self.orders[slot] += orders
+        self.revenue[slot] += revenue
+
+    def update(self, transactions):
+        """Streams transactions into the state; rows without a usable date are skipped."""
+        for t in transactions:
+            parsed = _parse_day(t['date'], self._dates)
+            customer_id = t['customer_id']
+            if not parsed or not customer_id:
+                self.skipped += 1
+                continue
+            day, month = parsed
+            slot = self._slot(customer_id)
+            self._record(slot, 1, t['quantity'] * t['unit_price'], day, day, month, 1)
+        return self
+
+    def merge(self, other):
+        """Merges another state (e.g. from a parallel chunk) into this one."""
+        for other_slot, customer_id in enumerate(other.ids):
+            if other.orders[other_slot] == 0:
+                continue
+            self._record(
+                self._slot(customer_id),
+                other.orders[other_slot],
+                other.revenue[other_slot],
+                other.first_day[other_slot],
+                other.last_day[other_slot],
+                other.first_month[other_slot],
+                other.activity[other_slot],
+                other.overflow.get(other_slot),
+            )
+        self.skipped += other.skipped
+        return self
+
+
+def build_customer_state(transactions):
+    """Builds a CustomerState in a single pass over `transactions`."""
+    return CustomerState().update(transactions)
+
+
+def repeat_purchase_rate(state):
+    """Share of customers with more than one purchase."""
+    if not len(state):
+        return 0.0
+    repeat = sum(1 for n in state.orders if n > 1)
+    return repeat / len(state)
+
+
+def customer_lifetime_value(state, top_n=5):
+    """Average revenue per customer plus the top N customers by revenue."""
+    n = len(state)
+    if not n:
+        return {'average': 0.0, 'top_customers': []}
+    top = heapq.nlargest(top_n, range(n), key=state.revenue.__getitem__)
+    return {
+        'average': sum(state.revenue) / n,
+        'top_customers': [(state.ids[i], state.revenue[i]) for i in top],
+    }
+
+
+def cohort_retention(state):
+    """Retention by first-purchase month.
+
+    Returns {'YYYY-MM': {'size': customers, 'retention': [share active in
+    month 0, 1, ...]}}, limited to the first ACTIVITY_MONTHS months.
+    Activity past that horizon is counted in `state.truncated`.
+    """
+    if state.truncated:
+        print(f"⚠ Cohort retention ignores {state.truncated} customer purchase months "
+              f"more than {ACTIVITY_MONTHS} months after first purchase")
+    counts = {}
+    for cohort, mask in zip(state.first_month, state.activity):
+        row = counts.get(cohort)
+        if row is None:
+            row = counts[cohort] = []
+        while mask:
+            low = mask & -mask
+            offset = low.bit_length() - 1
+            if offset >= len(row):
+                row.extend([0] * (offset + 1 - len(row)))
+            row[offset] += 1
+            mask ^= low
+    result = {}
+    for cohort in sorted(counts):
+        row = counts[cohort]
+        size = row[0] if row else 0
+        result[_month_label(cohort)] = {
+            'size': size,
+            'retention': [c / size for c in row] if size else [],
+        }
+    return result
+
+
+def _quintile_scores(values, higher_is_better=True):
+    """Scores each value 1-5 by rank; equal values share a score."""
+    n = len(values)
+    scores = array('B', bytes(n))
+    order = sorted(range(n), key=values.__getitem__, reverse=not higher_is_better)
+    start = 0
+    previous = None
+    for rank, i in enumerate(order):
+        if values[i] != previous:
+            start = rank
+            previous = values[i]
+        scores[i] = 1 + start * 5 // n
+    return scores
+
+
+def _segment(r, f):
+    if r >= 4 and f >= 4:
+        return 'Champions'
+    if r >= 3 and f >= 3:
+        return 'Loyal'
+    if r >= 4:
+        return 'New'
+    if r <= 2 and f >= 4:
+        return 'At Risk'
+    if r <= 2 and f <= 2:
+        return 'Lost'
+    return 'Needs Attention'
+
+
+def rfm_scores(state, reference_date=None):
+    """Returns (recency, frequency, monetary) score arrays, 1-5, indexed by slot.
+
+    Recency is measured in days before `reference_date` (default: the day
+    after the latest purchase).
+    """
+    if reference_date is None:
+        reference = max(state.last_day) + 1 if len(state) else 0
+    else:
+        reference = reference_date.toordinal()
+    recency = array('l', (reference - d for d in state.last_day))
+    return (
+        _quintile_scores(recency, higher_is_better=False),
+        _quintile_scores(state.orders),
+        _quintile_scores(state.revenue),
+    )
+
+
+def rfm_segmentation(state, reference_date=None):
+    """Counts customers per RFM segment."""
+    r_scores, f_scores, _ = rfm_scores(state, reference_date)
+    segments = {}
+    for r, f in zip(r_scores, f_scores):
+        label = _segment(r, f)
+        segments[label] = segments.get(label, 0) + 1
+    return segments
+
+
+def customer_summary(transactions):
+    """Runs all customer analyses over `transactions` in one streaming pass."""
+    state = build_customer_state(transactions)
+    return {
+        'customers': len(state),
+        'truncated_months': state.truncated,
+        'repeat_purchase_rate': repeat_purchase_rate(state),
+        'lifetime_value': customer_lifetime_value(state),
+        'cohort_retention': cohort_retention(state),
+        'rfm_segments': rfm_segmentation(state),
+    }
+
+
+if __name__ == "__main__":
+    test_data = [
+        {'customer_id': 'C1', 'quantity': 2, 'unit_price': 100, 'date': '2024-01-15'},
+        {'customer_id': 'C2', 'quantity': 1, 'unit_price': 200, 'date': '2024-01-16'},
+        {'customer_id': 'C1', 'quantity': 1, 'unit_price': 50, 'date': '2024-02-03'},
+        {'customer_id': 'C3', 'quantity': 4, 'unit_price': 25, 'date': '2024-02-10'},
+    ]
+    # Two chunks merged should match a single pass
+    merged = build_customer_state(test_data[:2]).merge(build_customer_state(test_data[2:]))
+    print("Repeat purchase rate:", repeat_purchase_rate(merged))
+    print("Lifetime value:", customer_lifetime_value(merged))
+    print("Cohort retention:", cohort_retention(merged))
+    print("RFM segments:", rfm_segmentation(merged))
@@ -87,6 +87,16 @@ def product_performance(transactions, bottom_n=3):
     return {'low_performers': dict(low_performers)}
 
 
+def product_wise_sales(transactions):
+    """Calculates total sales for each product."""
+    product_sales = {}
+    for t in transactions:
+        pid = t['product_id']
+        revenue = t['quantity'] * t['unit_price']
+        product_sales[pid] = product_sales.get(pid, 0) + revenue
+    return product_sales
+
+
 def enrich_transactions(transactions, products_dict):
     """Add category, brand, stock from API to each transaction."""
     enriched = []
@@ -356,23 +366,29 @@ def parse_and_clean_transactions(raw_lines):
     return transactions
 
 
-def validate_transactions(transactions):
-    """Validates transactions and returns valid ones + summary."""
-    valid = []
-    invalid_count = 0
-    for t in transactions:
-        # Business rules validation
-        is_valid = (
-            t['quantity'] > 0 and              # Can't sell 0 or negative items
-            t['unit_price'] > 0 and            # Can't have negative prices
-            len(t['date']) == 10 and           # Date must be YYYY-MM-DD (10 chars)
-            '-' in t['date']                   # Date must contain dashes
-        )
-        if is_valid:
-            valid.append(t)
-        else:
-            invalid_count += 1
-            print(f"⚠ Invalid transaction: {t.get('transaction_id')}")
+def validate_transactions(transactions, rules=None):
+    """Validates transactions against a rule set and returns valid ones.
+
+    `rules` defaults to `utils.validation.default_rules()`: present and unique
+    transaction IDs, positive quantity, price bounds and real ISO dates.
+    """
+    from utils.validation import compile_rules, to_columns
+
+    validator = compile_rules(rules)
+    invalid, failures = validator.run(to_columns(transactions, validator.columns))
+    if not invalid:
+        valid = list(transactions)
+    else:
+        valid = []
+        for i, t in enumerate(transactions):
+            if i not in invalid:
+                valid.append(t)
+            else:
+                print(f"⚠ Invalid transaction: {t.get('transaction_id')}")
+    invalid_count = len(invalid)
+    for name, count in failures.items():
+        if count:
+            print(f"  {name}: {count} failed")
     print(f"✓ Validation complete: {len(valid)} valid, {invalid_count} invalid")
     return valid
 
@@ -393,9 +409,16 @@ if __name__ == "__main__":
     total_revenue = sum(t['quantity'] * t['unit_price'] for t in valid_txs)
     print(f"Total transactions (valid): {len(valid_txs)}")
     print(f"Total revenue (valid): {total_revenue:.2f}")
-def parse_and_clean_transactions(raw_lines):
-    """Parses raw lines into cleaned transaction dictionaries."""
+def parse_and_clean_transactions(raw_lines, seen_index=None):
+    """Parses raw lines into cleaned transaction dictionaries.
+
+    If a `seen_index` (`utils.dedup_index.SeenIdIndex`) is given, rows whose
+    transaction_id was processed by an earlier run are dropped. This is a
+    lookup only: stage the rows that are actually used with
+    `utils.dedup_index.filter_seen` and commit once the run has succeeded.
+    """
     transactions = []
+    already_seen = 0
     for line in raw_lines:
         # Split by pipe delimiter
         fields = line.split('|')
@@ -415,10 +438,15 @@ def parse_and_clean_transactions(raw_lines):
                 'customer_id': fields[6].strip(),
                 'region': fields[7].strip()
             }
-            transactions.append(transaction)
         except ValueError as e:
             print(f"⚠ Skipping row with invalid data: {line[:50]}... Error: {e}")
             continue
+        if seen_index is not None and transaction['transaction_id'] in seen_index:
+            already_seen += 1
+            continue
+        transactions.append(transaction)
+    if already_seen:
+        print(f"⚠ Skipped {already_seen} already-processed transactions")
     print(f"✓ Parsed {len(transactions)} transactions")
     return transactions
 
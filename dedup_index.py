@@ -0,0 +1,328 @@
+"""Persistent index of transaction IDs already processed by earlier runs.
+
+IDs are reduced to 128-bit BLAKE2b keys. A memory-mapped Bloom filter
+answers "definitely new" for most lookups; possible hits are confirmed
+against the backing store, a set of sorted fixed-width key files ("runs")
+searched by bisection over a memory map. New keys are staged in memory
+(spilling to pending runs when large) and only become visible to later runs
+on `commit()`, so a run that fails part-way can simply be re-processed.
+An open index holds an exclusive lock on its directory until it is closed,
+so overlapping jobs sharing one index run one after another.
+
+The store keeps keys, not the IDs themselves. Two different IDs are treated
+as the same only if their 128-bit keys collide; with n stored IDs the chance
+of any such false drop is about n**2 / 2**129, i.e. below 1e-21 even at a
+billion IDs.
+"""
+from bisect import bisect_left
+import fcntl
+import hashlib
+import heapq
+import math
+import mmap
+import os
+import struct
+
+KEY_SIZE = 16
+_HEADER = struct.Struct('<QQQ')   # bloom file: num_bits, num_hashes, capacity
+BLOOM_NAME = 'bloom.bin'
+LOCK_NAME = 'lock'
+
+
+def id_key(transaction_id):
+    """128-bit key for a transaction ID (stable across processes)."""
+    return hashlib.blake2b(transaction_id.encode('utf-8'), digest_size=KEY_SIZE).digest()
+
+
+class BloomFilter:
+    """Bloom filter over id keys, memory-mapped from a file.
+
+    Bits are set in place, so opening a filter reads nothing up front and
+    `flush()` writes back only the pages touched since; cost per run tracks
+    the keys it adds, not the size of the filter.
+    """
+
+    def __init__(self, path):
+        self._file = open(path, 'r+b')
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        self.num_bits, self.num_hashes, self.capacity = _HEADER.unpack_from(self._map)
+        if len(self._map) < _HEADER.size + (self.num_bits + 7) // 8:
+            self.close()
+            raise ValueError(f"truncated Bloom filter: {path}")
+        self.bits = memoryview(self._map)[_HEADER.size:]
+
+    @classmethod
+    def create(cls, path, capacity, error_rate=0.01):
+        """Creates an empty filter for `capacity` keys at `path` and opens it."""
+        capacity = max(1, capacity)
+        num_bits = max(64, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        num_hashes = max(1, round(num_bits / capacity * math.log(2)))
+        with open(path, 'wb') as f:
+            f.write(_HEADER.pack(num_bits, num_hashes, capacity))
+            # Extending with truncate() leaves the zero bits sparse on disk
+            f.truncate(_HEADER.size + (num_bits + 7) // 8)
+        return cls(path)
+
+    def _positions(self, key):
+        h1 = int.from_bytes(key[:8], 'little')
+        h2 = int.from_bytes(key[8:], 'little') | 1
+        m = self.num_bits
+        return [(h1 + i * h2) % m for i in range(self.num_hashes)]
+
+    def add(self, key):
+        """Adds `key`; returns True if it may already have been present."""
+        bits = self.bits
+        present = True
+        for pos in self._positions(key):
+            byte, bit = pos >> 3, 1 << (pos & 7)
+            if not bits[byte] & bit:
+                present = False
+                bits[byte] |= bit
+        return present
+
+    def __contains__(self, key):
+        bits = self.bits
+        for pos in self._positions(key):
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+    def flush(self):
+        """Writes modified pages back to the file."""
+        self._map.flush()
+
+    def close(self):
+        if getattr(self, 'bits', None) is not None:
+            self.bits.release()
+            self.bits = None
+        self._map.close()
+        self._file.close()
+
+
+class _Keys:
+    """Sequence view of fixed-width keys in a buffer, for `bisect`."""
+
+    def __init__(self, buf):
+        self.buf = buf
+
+    def __len__(self):
+        return len(self.buf) // KEY_SIZE
+
+    def __getitem__(self, i):
+        start = i * KEY_SIZE
+        return self.buf[start:start + KEY_SIZE]
+
+    def __iter__(self):
+        buf = self.buf
+        for start in range(0, len(buf), KEY_SIZE):
+            yield buf[start:start + KEY_SIZE]
+
+
+class _Run:
+    """A sorted, read-only file of fixed-width keys."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        if size:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.keys = _Keys(self._map)
+        else:
+            self._map = None
+            self.keys = _Keys(b'')
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, key):
+        keys = self.keys
+        i = bisect_left(keys, key)
+        return i < len(keys) and keys[i] == key
+
+    @staticmethod
+    def write(path, sorted_keys, chunk=1 << 16):
+        """Writes keys (already sorted) to `path` without materializing them all."""
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            buf = []
+            for key in sorted_keys:
+                buf.append(key)
+                if len(buf) >= chunk:
+                    f.write(b''.join(buf))
+                    buf = []
+            f.write(b''.join(buf))
+        os.replace(tmp, path)
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+
+class SeenIdIndex:
+    """Disk-backed set of transaction IDs seen by committed runs.
+
+    `expected_ids` sizes the Bloom filter when the index is first created.
+    Once the committed keys outgrow the filter, `commit()` compacts the runs
+    and rebuilds the filter for the new total, keeping disk lookups rare.
+    Opening blocks while another instance has the same directory open.
+    """
+
+    def __init__(self, directory, expected_ids=1000000, error_rate=0.01,
+                 spill_limit=1000000, max_runs=8):
+        self.directory = directory
+        self.expected_ids = expected_ids
+        self.error_rate = error_rate
+        self.spill_limit = spill_limit
+        self.max_runs = max_runs
+        os.makedirs(directory, exist_ok=True)
+        # Held until close(): concurrent writers would otherwise pick the same
+        # run names and overwrite each other's runs and Bloom filter
+        self._lock = open(os.path.join(directory, LOCK_NAME), 'a')
+        try:
+            fcntl.flock(self._lock.fileno(), fcntl.LOCK_EX)
+            self._open()
+        except BaseException:
+            self._lock.close()
+            self._lock = None
+            raise
+
+    def _open(self):
+        """Loads the on-disk state; only called with the directory lock held."""
+        directory = self.directory
+        # Pending runs left by an interrupted run were never committed
+        for name in os.listdir(directory):
+            if name.startswith('pending-') or name.endswith('.tmp'):
+                os.remove(os.path.join(directory, name))
+        bloom_path = os.path.join(directory, BLOOM_NAME)
+        if not os.path.exists(bloom_path):
+            BloomFilter.create(bloom_path + '.tmp', self.expected_ids, self.error_rate).close()
+            os.replace(bloom_path + '.tmp', bloom_path)
+        self.bloom = BloomFilter(bloom_path)
+        self.runs = [_Run(os.path.join(directory, name))
+                     for name in sorted(os.listdir(directory))
+                     if name.startswith('run-') and name.endswith('.ids')]
+        self.pending_runs = []
+        self.memtable = set()
+        self._seq = max([int(r.path[-12:-4]) for r in self.runs], default=0)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _next_name(self, prefix):
+        self._seq += 1
+        return os.path.join(self.directory, f"{prefix}-{self._seq:08d}.ids")
+
+    def _on_disk(self, key):
+        for run in self.pending_runs:
+            if key in run:
+                return True
+        for run in self.runs:
+            if key in run:
+                return True
+        return False
+
+    def __contains__(self, transaction_id):
+        key = id_key(transaction_id)
+        return key in self.memtable or (key in self.bloom and self._on_disk(key))
+
+    def check_and_add(self, transaction_id):
+        """Stages `transaction_id`; returns False if it was already seen."""
+        key = id_key(transaction_id)
+        if key in self.memtable:
+            return False
+        if self.bloom.add(key) and self._on_disk(key):
+            return False
+        self.memtable.add(key)
+        if len(self.memtable) >= self.spill_limit:
+            self._spill()
+        return True
+
+    def _spill(self):
+        if not self.memtable:
+            return
+        path = self._next_name('pending')
+        _Run.write(path, sorted(self.memtable))
+        self.pending_runs.append(_Run(path))
+        self.memtable = set()
+
+    def committed_count(self):
+        return sum(len(run) for run in self.runs)
+
+    def commit(self):
+        """Makes every staged ID permanent."""
+        self._spill()
+        # Bloom first: a superset of committed keys only costs extra lookups
+        self.bloom.flush()
+        for run in self.pending_runs:
+            run.close()
+            path = os.path.join(self.directory, os.path.basename(run.path).replace('pending-', 'run-'))
+            os.replace(run.path, path)
+            self.runs.append(_Run(path))
+        self.pending_runs = []
+        if len(self.runs) > self.max_runs or self.committed_count() > self.bloom.capacity:
+            self.compact()
+
+    def compact(self):
+        """Merges all committed runs into one and rebuilds the Bloom filter.
+
+        The new filter is sized for twice the committed key count (at least
+        its previous capacity), so it keeps pace with a growing history.
+        """
+        total = self.committed_count()
+        bloom_path = os.path.join(self.directory, BLOOM_NAME)
+        bloom = BloomFilter.create(bloom_path + '.tmp', max(self.bloom.capacity, 2 * total), self.error_rate)
+        path = self._next_name('run')
+
+        def merged():
+            for key in heapq.merge(*(run.keys for run in self.runs)):
+                bloom.add(key)
+                yield key
+
+        _Run.write(path, merged())
+        bloom.flush()
+        os.replace(bloom_path + '.tmp', bloom_path)
+        self.bloom.close()
+        self.bloom = bloom
+        old = self.runs
+        self.runs = [_Run(path)]
+        for run in old:
+            run.close()
+            os.remove(run.path)
+
+    def close(self):
+        """Closes the index, discarding anything not committed."""
+        for run in self.pending_runs:
+            run.close()
+            os.remove(run.path)
+        for run in self.runs:
+            run.close()
+        self.bloom.close()
+        self.pending_runs = []
+        self.runs = []
+        self.memtable = set()
+        if self._lock is not None:
+            self._lock.close()    # releases the directory lock
+            self._lock = None
+
+
+def filter_seen(transactions, index):
+    """Returns transactions whose IDs the index has not seen, staging them."""
+    return [t for t in transactions if index.check_and_add(t['transaction_id'])]
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as d:
+        batch = [{'transaction_id': f'TXN{i:03d}'} for i in range(5)]
+        with SeenIdIndex(d, expected_ids=1000) as index:
+            print("First delivery:", len(filter_seen(batch, index)), "new")
+            index.commit()
+        with SeenIdIndex(d, expected_ids=1000) as index:
+            redelivery = batch[3:] + [{'transaction_id': 'TXN999'}]
+            print("Overlapping delivery:", len(filter_seen(redelivery, index)), "new")
@@ -5,86 +5,94 @@ from utils.file_handler import read_sales_data
 from utils.data_processor import (
     parse_and_clean_transactions,
     validate_transactions,
-    calculate_total_revenue,
-    region_wise_sales,
-    date_based_analysis,
-    product_performance,
     enrich_transactions,
 )
-from utils.api_handler import fetch_all_products, save_enriched_data
-
+from utils.query_cache import (
+    METRICS,
+    QueryCache,
+    apply_filters,
+    cached_metric,
+    content_fingerprint,
+    normalize_spec,
+)
 
-def generate_sales_report(transactions, enriched_transactions):
-    """Generates a comprehensive sales report."""
+DATA_PATH = 'data/sales_data.txt'
+CACHE_DIR = 'output/.query_cache'
+# Directory of the persistent seen-ID index; unset disables cross-run dedup
+SEEN_ID_INDEX_DIR = os.environ.get('SALES_SEEN_ID_INDEX')
+# Comma-separated report formats (txt, csv, json, html)
+REPORT_FORMATS = tuple(dict.fromkeys(
+    f.strip() for f in os.environ.get('SALES_REPORT_FORMATS', 'txt').split(',') if f.strip()))
+REPORT_DETAILED = os.environ.get('SALES_REPORT_DETAILED') == '1'
+# Comma-separated allowed regions; unset accepts any region
+KNOWN_REGIONS = tuple(r.strip() for r in os.environ.get('SALES_KNOWN_REGIONS', '').split(',') if r.strip())
+
+
+def generate_sales_report(transactions, enriched_transactions, cache=None, fingerprint=None,
+                          formats=('txt',), detailed=False):
+    """Generates a comprehensive sales report in each of `formats`.
+
+    When a `cache` and a `fingerprint` identifying `transactions` are given,
+    the aggregations are served from the query cache. `detailed` adds the
+    full daily trend and per-product tables. Returns True if every report
+    was written.
+    """
     # Calculate metrics
-    total_revenue = calculate_total_revenue(transactions)
+    if cache is not None:
+        def metric(name):
+            return cached_metric(cache, fingerprint, transactions, name)
+    else:
+        def metric(name):
+            return METRICS[name](transactions)
+
+    total_revenue = metric('total_revenue')
     total_trans = len(transactions)
-    avg_order = total_revenue / total_trans if total_trans else 0
-
-    date_analysis = date_based_analysis(transactions)
-    region_analysis = region_wise_sales(transactions)
-    product_analysis = product_performance(transactions)
-
-    # Build report lines
-    report_lines = [
-        "=" * 60,
-        "SALES ANALYTICS REPORT".center(60),
-        "=" * 60,
-        f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-        f"Total Records Processed: {total_trans}",
-        "",
-        "-" * 60,
-        "OVERALL SUMMARY",
-        "-" * 60,
-        f"Total Revenue: ${total_revenue:,.2f}",
-        f"Total Transactions: {total_trans}",
-        f"Average Order Value: ${avg_order:,.2f}",
-        f"Date Range: {date_analysis['date_range'][0]} to {date_analysis['date_range'][1]}",
-        f"Peak Sales Day: {date_analysis['peak_day']}",
-        "",
-        "-" * 60,
-        "REGION-WISE PERFORMANCE",
-        "-" * 60,
-        f"{'Region':<20} {'Total Sales':>15}",
-    ]
-
-    # Add region data (sorted by sales descending)
-    for region, sales in sorted(region_analysis.items(), key=lambda x: x[1], reverse=True):
-        report_lines.append(f"{region:<20} ${sales:>14,.2f}")
-
-    report_lines.extend([
-        "",
-        "-" * 60,
-        "LOW PERFORMING PRODUCTS (Bottom 3)",
-        "-" * 60,
-        f"{'Product ID':<15} {'Revenue':>15}",
-    ])
-
-    # Add low performers
-    for pid, rev in product_analysis['low_performers'].items():
-        report_lines.append(f"{pid:<15} ${rev:>14,.2f}")
-
-    report_lines.extend([
-        "",
-        "=" * 60,
-        "END OF REPORT",
-        "=" * 60,
-    ])
-
-    # Ensure output dir exists
-    os.makedirs("output", exist_ok=True)
-
-    # Write to file
+
+    metrics = {
+        'generated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'total_records': total_trans,
+        'total_revenue': total_revenue,
+        'avg_order': total_revenue / total_trans if total_trans else 0,
+        'date_analysis': metric('date_analysis'),
+        'region_sales': metric('region_sales'),
+        'product_performance': metric('product_performance'),
+    }
+    if detailed:
+        metrics['product_sales'] = metric('product_sales')
+
+    # Render every format in one pass
+    from utils.report_renderer import render_report
+
     try:
-        with open('output/sales_report.txt', 'w', encoding='utf-8') as f:
-            f.write('\n'.join(report_lines))
-        print("✓ Report generated: output/sales_report.txt")
+        for path in render_report(metrics, formats=formats, detailed=detailed):
+            print(f"✓ Report generated: {path}")
     except Exception as e:
         print(f"✗ Error generating report: {e}")
+        return False
+    return True
 
 
 def main():
     """Main workflow of the sales analytics system."""
+    if not SEEN_ID_INDEX_DIR:
+        run_pipeline()
+        return
+
+    from utils.dedup_index import SeenIdIndex
+
+    # Closing without commit() discards this run's staged IDs
+    with SeenIdIndex(SEEN_ID_INDEX_DIR) as seen_index:
+        if run_pipeline(seen_index):
+            # Only now are this run's transaction IDs recorded as processed
+            seen_index.commit()
+
+
+def run_pipeline(seen_index=None):
+    """Runs the analysis once; returns True if the reports were generated.
+
+    With a `seen_index`, transactions processed by earlier runs are skipped
+    and the ones reported on here are staged in the index.
+    """
 
     print("\n" + "=" * 60)
     print("SALES ANALYTICS SYSTEM".center(60))
@@ -92,21 +100,23 @@ def main():
 
     # === STEP 1-3: Read, Parse, Validate ===
     print(" Step 1: Reading sales data...")
-    raw_lines = read_sales_data('data/sales_data.txt')
+    raw_lines = read_sales_data(DATA_PATH)
 
     if not raw_lines:
         print(" No data to process. Exiting.")
-        return
+        return False
 
     print("\n Step 2: Parsing transactions...")
-    transactions = parse_and_clean_transactions(raw_lines)
+    transactions = parse_and_clean_transactions(raw_lines, seen_index)
 
     print("\n Step 3: Validating data...")
-    transactions = validate_transactions(transactions)
+    from utils.validation import default_rules, rules_signature
+
+    transactions = validate_transactions(transactions, default_rules(known_regions=KNOWN_REGIONS))
 
     if not transactions:
         print(" No valid transactions. Exiting.")
-        return
+        return False
 
     # === STEP 4-6: User Filtering ===
     print("\n" + "-" * 60)
@@ -121,6 +131,7 @@ def main():
     print(f"Transaction amount range: ${min(amounts):,.2f} - ${max(amounts):,.2f}")
 
     # Ask user if they want to filter
+    filters = {}
     filter_choice = input("\n🔍 Apply filters? (y/n): ").strip().lower()
 
     if filter_choice == 'y':
@@ -133,51 +144,71 @@ def main():
         min_amt = input("  Minimum amount: ").strip()
         max_amt = input("  Maximum amount: ").strip()
 
-        # Apply filters
-        filtered = transactions
-
         if region_filter:
-            filtered = [t for t in filtered if t['region'] == region_filter]
+            filters['region'] = region_filter
             print(f"  ✓ Filtered by region: {region_filter}")
 
         if min_amt:
             try:
-                min_val = float(min_amt)
-                filtered = [t for t in filtered if t['quantity']*t['unit_price'] >= min_val]
-                print(f"  ✓ Filtered by min amount: ${min_val:,.2f}")
+                filters['min_amount'] = float(min_amt)
+                print(f"  ✓ Filtered by min amount: ${filters['min_amount']:,.2f}")
             except ValueError:
                 print("  ⚠ Invalid min amount, skipping")
 
         if max_amt:
             try:
-                max_val = float(max_amt)
-                filtered = [t for t in filtered if t['quantity']*t['unit_price'] <= max_val]
-                print(f"  ✓ Filtered by max amount: ${max_val:,.2f}")
+                filters['max_amount'] = float(max_amt)
+                print(f"  ✓ Filtered by max amount: ${filters['max_amount']:,.2f}")
             except ValueError:
                 print("  ⚠ Invalid max amount, skipping")
 
-        transactions = filtered
+        # The same filters make up the cache key below
+        transactions = apply_filters(transactions, **filters)
         print(f"\n✓ Filtered to {len(transactions)} records")
 
+    # Stage only rows that passed validation and filtering, so rejected or
+    # filtered-out rows are picked up again when re-delivered
+    if seen_index is not None:
+        from utils.dedup_index import filter_seen
+
+        transactions = filter_seen(transactions, seen_index)
+
+    # Cache key for this exact view: source data content + applied filters
+    cache = QueryCache(disk_dir=CACHE_DIR)
+    source_fp = content_fingerprint(raw_lines, version=rules_signature(known_regions=KNOWN_REGIONS))
+    if seen_index is not None:
+        # The same file yields different rows depending on what was already
+        # seen, so also key on the IDs kept (cheap next to hashing every row)
+        source_fp = content_fingerprint((t['transaction_id'] for t in transactions), version=source_fp)
+    view_fp = QueryCache.make_key(source_fp, normalize_spec('view', **filters))
+
     # === STEP 7-8: Display Analysis ===
     print("\n" + "-" * 60)
     print("QUICK ANALYSIS")
     print("-" * 60)
 
-    total_rev = calculate_total_revenue(transactions)
+    total_rev = cached_metric(cache, view_fp, transactions, 'total_revenue')
     print(f" Total Revenue: ${total_rev:,.2f}")
 
-    regions_sales = region_wise_sales(transactions)
+    regions_sales = cached_metric(cache, view_fp, transactions, 'region_sales')
     print(f" Top Region: {max(regions_sales, key=regions_sales.get)} (${max(regions_sales.values()):,.2f})")
 
-    date_info = date_based_analysis(transactions)
+    date_info = cached_metric(cache, view_fp, transactions, 'date_analysis')
     print(f" Peak Sales Day: {date_info['peak_day']}")
 
+    from utils.customer_analytics import build_customer_state, repeat_purchase_rate
+
+    customers = build_customer_state(transactions)
+    print(f" Customers: {len(customers)} (repeat purchase rate {repeat_purchase_rate(customers):.1%})")
+
     # === STEP 9-11: API Enrichment ===
     print("\n" + "-" * 60)
     print("API ENRICHMENT")
     print("-" * 60)
 
+    # Loaded here so runs that exit early never import the API stack
+    from utils.api_handler import fetch_all_products, save_enriched_data
+
     products_dict = fetch_all_products()
     enriched = enrich_transactions(transactions, products_dict)
     save_enriched_data(enriched)
@@ -187,7 +218,9 @@ def main():
     print("REPORT GENERATION")
     print("-" * 60)
 
-    generate_sales_report(transactions, enriched)
+    if not generate_sales_report(transactions, enriched, cache=cache, fingerprint=view_fp,
+                                 formats=REPORT_FORMATS, detailed=REPORT_DETAILED):
+        return False
 
     # === Completion ===
     print("\n" + "=" * 60)
@@ -195,8 +228,10 @@ def main():
     print("=" * 60)
     print("\nGenerated files:")
     print("   output/enriched_sales_data.txt")
-    print("   output/sales_report.txt")
+    for fmt in REPORT_FORMATS:
+        print(f"   output/sales_report.{fmt}")
     print("\n")
+    return True
 
 
 if __name__ == "__main__":
@@ -0,0 +1,248 @@
+import os
+from collections import OrderedDict
+from itertools import islice
+
+from utils.data_processor import (
+    calculate_total_revenue,
+    region_wise_sales,
+    date_based_analysis,
+    product_performance,
+    product_wise_sales,
+)
+
+
+# Metric name -> aggregation function it caches
+METRICS = {
+    'total_revenue': calculate_total_revenue,
+    'region_sales': region_wise_sales,
+    'date_analysis': date_based_analysis,
+    'product_performance': product_performance,
+    'product_sales': product_wise_sales,
+}
+
+
+def content_fingerprint(lines, version='', chunk=4096):
+    """Fingerprint of a dataset from its raw lines, as returned by `read_sales_data`.
+
+    Hashes the content itself, so any change to the data, even one that
+    keeps the file size and mtime, produces a new fingerprint. `version`
+    should identify the parsing/validation pipeline that turns the lines
+    into transactions, so changing the rules invalidates cached results.
+    Order sensitive; lines must not contain newlines.
+    """
+    import hashlib
+
+    h = hashlib.sha256(f"{version}\n".encode('utf-8'))
+    lines = iter(lines)
+    while True:
+        block = list(islice(lines, chunk))
+        if not block:
+            break
+        # Terminate every line so block boundaries cannot shift content
+        h.update(('\n'.join(block) + '\n').encode('utf-8'))
+    return h.hexdigest()
+
+
+def dataset_fingerprint(transactions):
+    """Content fingerprint of parsed transactions (order sensitive)."""
+    import hashlib
+
+    h = hashlib.sha256()
+    for t in transactions:
+        h.update(repr(sorted(t.items())).encode('utf-8'))
+        h.update(b'\n')
+    return h.hexdigest()
+
+
+def normalize_spec(metric, region=None, min_amount=None, max_amount=None, **params):
+    """Builds a canonical, hashable spec so equivalent queries share a cache key."""
+    return (
+        metric,
+        region or None,
+        None if min_amount is None else float(min_amount),
+        None if max_amount is None else float(max_amount),
+        tuple(sorted(params.items())),
+    )
+
+
+def apply_filters(transactions, region=None, min_amount=None, max_amount=None):
+    """Applies the region / amount filters used by the interactive menu."""
+    filtered = transactions
+    if region:
+        filtered = [t for t in filtered if t['region'] == region]
+    if min_amount is not None:
+        filtered = [t for t in filtered if t['quantity'] * t['unit_price'] >= min_amount]
+    if max_amount is not None:
+        filtered = [t for t in filtered if t['quantity'] * t['unit_price'] <= max_amount]
+    return filtered
+
+
+class QueryCache:
+    """LRU result cache bounded by entry count and approximate byte size.
+
+    Entries are keyed by (dataset fingerprint, normalized spec), so a change
+    to the underlying data produces new keys and stale results simply age out.
+    If `disk_dir` is given, computed results are also pickled there and
+    reloaded on a memory miss; the disk tier is bounded by `max_disk_entries`
+    and `max_disk_bytes`, evicting least recently used files by mtime.
+    """
+
+    def __init__(self, max_entries=128, max_bytes=16 * 1024 * 1024, disk_dir=None,
+                 max_disk_entries=512, max_disk_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.max_disk_entries = max_disk_entries
+        self.max_disk_bytes = max_disk_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(fingerprint, spec):
+        import hashlib
+
+        return hashlib.sha256(repr((fingerprint, spec)).encode('utf-8')).hexdigest()
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.pkl")
+
+    def _store(self, key, blob):
+        if key in self._entries:
+            self._size -= len(self._entries.pop(key))
+        if len(blob) > self.max_bytes:
+            return
+        self._entries[key] = blob
+        self._size += len(blob)
+        while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+            _, old = self._entries.popitem(last=False)
+            self._size -= len(old)
+
+    def get(self, key):
+        """Returns (found, value); checks memory first, then the disk tier."""
+        import pickle
+
+        blob = self._entries.get(key)
+        if blob is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, pickle.loads(blob)
+        if self.disk_dir:
+            path = self._disk_path(key)
+            try:
+                with open(path, 'rb') as f:
+                    blob = f.read()
+                value = pickle.loads(blob)
+            except FileNotFoundError:
+                pass
+            except Exception:
+                # Corrupt or outdated entry: drop it and recompute
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            else:
+                try:
+                    os.utime(path)   # mtime doubles as the disk LRU clock
+                except OSError:
+                    pass
+                self._store(key, blob)
+                self.hits += 1
+                return True, value
+        self.misses += 1
+        return False, None
+
+    def put(self, key, value):
+        import pickle
+
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        self._store(key, blob)
+        if self.disk_dir:
+            tmp = self._disk_path(key) + '.tmp'
+            try:
+                with open(tmp, 'wb') as f:
+                    f.write(blob)
+                os.replace(tmp, self._disk_path(key))
+            except OSError as e:
+                print(f"⚠ Could not write cache entry to disk: {e}")
+            else:
+                self._prune_disk()
+
+    def _prune_disk(self):
+        """Evicts the least recently used disk entries beyond the disk bounds."""
+        entries = []
+        total = 0
+        for name in os.listdir(self.disk_dir):
+            if not name.endswith('.pkl'):
+                continue
+            path = os.path.join(self.disk_dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime_ns, st.st_size, path))
+            total += st.st_size
+        entries.sort()
+        count = len(entries)
+        for _, size, path in entries:
+            if count <= self.max_disk_entries and total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            count -= 1
+            total -= size
+
+    def get_or_compute(self, fingerprint, spec, compute):
+        """Returns the cached result for (fingerprint, spec), computing it on a miss."""
+        if fingerprint is None:
+            return compute()
+        key = self.make_key(fingerprint, spec)
+        found, value = self.get(key)
+        if found:
+            return value
+        value = compute()
+        self.put(key, value)
+        return value
+
+    def clear(self, include_disk=False):
+        self._entries.clear()
+        self._size = 0
+        if include_disk and self.disk_dir:
+            for name in os.listdir(self.disk_dir):
+                if name.endswith('.pkl'):
+                    os.remove(os.path.join(self.disk_dir, name))
+
+
+def cached_metric(cache, fingerprint, transactions, metric, region=None,
+                  min_amount=None, max_amount=None, **params):
+    """Runs a named aggregation over the filtered transactions through `cache`.
+
+    `transactions` is the unfiltered dataset described by `fingerprint`; the
+    filters are part of the cache key and are only applied on a miss.
+    """
+    func = METRICS[metric]
+    spec = normalize_spec(metric, region, min_amount, max_amount, **params)
+
+    def compute():
+        rows = apply_filters(transactions, region, min_amount, max_amount)
+        return func(rows, **params)
+
+    return cache.get_or_compute(fingerprint, spec, compute)
+
+
+if __name__ == "__main__":
+    test_data = [
+        {'product_id': '1', 'quantity': 2, 'unit_price': 100, 'region': 'North', 'date': '2024-01-15'},
+        {'product_id': '2', 'quantity': 1, 'unit_price': 200, 'region': 'South', 'date': '2024-01-16'},
+    ]
+    cache = QueryCache(max_entries=8)
+    fp = dataset_fingerprint(test_data)
+    print("Region sales:", cached_metric(cache, fp, test_data, 'region_sales'))
+    print("Region sales (cached):", cached_metric(cache, fp, test_data, 'region_sales'))
+    print("North revenue:", cached_metric(cache, fp, test_data, 'total_revenue', region='North'))
+    print(f"Cache hits: {cache.hits}, misses: {cache.misses}")
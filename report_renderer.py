@@ -0,0 +1,323 @@
+"""Multi-format rendering of one computed sales metrics result.
+
+A report is a sequence of sections. Each section's rows come from a
+generator that is consumed once, with every row fanned out to all open
+writers, so text, CSV, JSON and HTML outputs are produced in a single pass
+and large tables (daily trend, per-product sales) are never held as
+formatted lines in memory.
+"""
+import os
+
+WIDTH = 60
+
+
+class Column:
+    """A table column; `money` values are rendered as currency."""
+
+    def __init__(self, key, label, width, money=False):
+        self.key = key
+        self.label = label
+        self.width = width
+        self.money = money
+
+
+class Section:
+    """A report section: either key/value `items` or a table of `rows`.
+
+    `items` is a list of (key, label, value, money) tuples; `rows` is an
+    iterable of tuples matching `columns`.
+    """
+
+    def __init__(self, key, title, items=None, columns=None, rows=None):
+        self.key = key
+        self.title = title
+        self.items = items
+        self.columns = columns
+        self.rows = rows
+
+
+def _format_value(value, money=False):
+    if money:
+        return f"${value:,.2f}"
+    if isinstance(value, tuple):
+        return f"{value[0]} to {value[1]}"
+    return str(value)
+
+
+def build_sections(metrics, detailed=False):
+    """Yields the report sections for a metrics dict.
+
+    The metrics dict is the one built by `main.generate_sales_report`.
+    """
+    date_analysis = metrics['date_analysis']
+    yield Section('summary', 'OVERALL SUMMARY', items=[
+        ('total_revenue', 'Total Revenue', metrics['total_revenue'], True),
+        ('total_transactions', 'Total Transactions', metrics['total_records'], False),
+        ('average_order_value', 'Average Order Value', metrics['avg_order'], True),
+        ('date_range', 'Date Range', tuple(date_analysis['date_range']), False),
+        ('peak_day', 'Peak Sales Day', date_analysis['peak_day'], False),
+    ])
+
+    region_sales = metrics['region_sales']
+    yield Section(
+        'regions', 'REGION-WISE PERFORMANCE',
+        columns=[Column('region', 'Region', 20), Column('total_sales', 'Total Sales', 15, money=True)],
+        rows=sorted(region_sales.items(), key=lambda x: x[1], reverse=True),
+    )
+
+    yield Section(
+        'low_performers', 'LOW PERFORMING PRODUCTS (Bottom 3)',
+        columns=[Column('product_id', 'Product ID', 15), Column('revenue', 'Revenue', 15, money=True)],
+        rows=iter(metrics['product_performance']['low_performers'].items()),
+    )
+
+    if detailed:
+        daily = date_analysis['daily_trend']
+        yield Section(
+            'daily_trend', 'DAILY SALES TREND',
+            columns=[Column('date', 'Date', 15), Column('revenue', 'Revenue', 15, money=True)],
+            rows=((day, daily[day]) for day in sorted(daily)),
+        )
+        products = metrics['product_sales']
+        yield Section(
+            'product_sales', 'PRODUCT PERFORMANCE',
+            columns=[Column('product_id', 'Product ID', 15), Column('revenue', 'Revenue', 15, money=True)],
+            rows=((pid, products[pid]) for pid in sorted(products, key=products.get, reverse=True)),
+        )
+
+
+class TextWriter:
+    """The fixed-width text layout of `output/sales_report.txt`."""
+
+    extension = 'txt'
+
+    def __init__(self, f):
+        self.f = f
+        self._first = True
+
+    def _line(self, text=''):
+        if not self._first:
+            self.f.write('\n')
+        self._first = False
+        self.f.write(text)
+
+    def begin(self, metrics):
+        self._line("=" * WIDTH)
+        self._line("SALES ANALYTICS REPORT".center(WIDTH))
+        self._line("=" * WIDTH)
+        self._line(f"Generated: {metrics['generated']}")
+        self._line(f"Total Records Processed: {metrics['total_records']}")
+
+    def begin_section(self, section):
+        self._line()
+        self._line("-" * WIDTH)
+        self._line(section.title)
+        self._line("-" * WIDTH)
+        if section.items is not None:
+            for _, label, value, money in section.items:
+                self._line(f"{label}: {_format_value(value, money)}")
+        else:
+            first, *rest = section.columns
+            self._line(' '.join([f"{first.label:<{first.width}}"] + [f"{c.label:>{c.width}}" for c in rest]))
+
+    def write_row(self, section, row):
+        cells = []
+        for column, value in zip(section.columns, row):
+            if column.money:
+                cells.append(f"${value:>{column.width - 1},.2f}")
+            elif not cells:
+                cells.append(f"{value:<{column.width}}")
+            else:
+                cells.append(f"{value:>{column.width}}")
+        self._line(' '.join(cells))
+
+    def end_section(self, section):
+        pass
+
+    def end(self):
+        self._line()
+        self._line("=" * WIDTH)
+        self._line("END OF REPORT")
+        self._line("=" * WIDTH)
+
+
+class CsvWriter:
+    """Sections as consecutive CSV blocks separated by blank rows."""
+
+    extension = 'csv'
+
+    def __init__(self, f):
+        import csv
+
+        self.writer = csv.writer(f, lineterminator='\n')
+
+    def begin(self, metrics):
+        self.writer.writerow(['generated', metrics['generated']])
+        self.writer.writerow(['total_records', metrics['total_records']])
+
+    def begin_section(self, section):
+        self.writer.writerow([])
+        self.writer.writerow([section.key])
+        if section.items is not None:
+            for key, _, value, _ in section.items:
+                self.writer.writerow([key] + (list(value) if isinstance(value, tuple) else [value]))
+        else:
+            self.writer.writerow([c.key for c in section.columns])
+
+    def write_row(self, section, row):
+        self.writer.writerow(row)
+
+    def end_section(self, section):
+        pass
+
+    def end(self):
+        pass
+
+
+class JsonWriter:
+    """A JSON object written incrementally, one table row at a time."""
+
+    extension = 'json'
+
+    def __init__(self, f):
+        import json
+
+        self.f = f
+        self.dumps = json.dumps
+        self._first_section = True
+        self._first_row = True
+
+    def begin(self, metrics):
+        self.f.write('{"generated": %s, "total_records": %s, "sections": {'
+                     % (self.dumps(metrics['generated']), self.dumps(metrics['total_records'])))
+
+    def begin_section(self, section):
+        if not self._first_section:
+            self.f.write(', ')
+        self._first_section = False
+        self.f.write('%s: {"title": %s, ' % (self.dumps(section.key), self.dumps(section.title)))
+        if section.items is not None:
+            values = {key: list(v) if isinstance(v, tuple) else v for key, _, v, _ in section.items}
+            self.f.write('"values": %s' % self.dumps(values))
+        else:
+            self.f.write('"columns": %s, "rows": [' % self.dumps([c.key for c in section.columns]))
+            self._first_row = True
+
+    def write_row(self, section, row):
+        if not self._first_row:
+            self.f.write(', ')
+        self._first_row = False
+        self.f.write('\n  ' + self.dumps(list(row)))
+
+    def end_section(self, section):
+        if section.items is None:
+            self.f.write(']')
+        self.f.write('}')
+
+    def end(self):
+        self.f.write('}}\n')
+
+
+class HtmlWriter:
+    """A standalone HTML page with one table per section."""
+
+    extension = 'html'
+
+    def __init__(self, f):
+        from html import escape
+
+        self.f = f
+        self.escape = escape
+
+    def begin(self, metrics):
+        self.f.write('<!DOCTYPE html>\n<html><head><meta charset="utf-8">'
+                     '<title>Sales Analytics Report</title></head><body>\n'
+                     '<h1>Sales Analytics Report</h1>\n')
+        self.f.write(f"<p>Generated: {self.escape(metrics['generated'])}<br>"
+                     f"Total Records Processed: {metrics['total_records']}</p>\n")
+
+    def begin_section(self, section):
+        esc = self.escape
+        self.f.write(f'<h2>{esc(section.title)}</h2>\n<table>\n')
+        if section.items is not None:
+            for _, label, value, money in section.items:
+                self.f.write(f'<tr><th>{esc(label)}</th><td>{esc(_format_value(value, money))}</td></tr>\n')
+        else:
+            self.f.write('<tr>' + ''.join(f'<th>{esc(c.label)}</th>' for c in section.columns) + '</tr>\n')
+
+    def write_row(self, section, row):
+        cells = (_format_value(v, c.money) for c, v in zip(section.columns, row))
+        self.f.write('<tr>' + ''.join(f'<td>{self.escape(cell)}</td>' for cell in cells) + '</tr>\n')
+
+    def end_section(self, section):
+        self.f.write('</table>\n')
+
+    def end(self):
+        self.f.write('</body></html>\n')
+
+
+WRITERS = {w.extension: w for w in (TextWriter, CsvWriter, JsonWriter, HtmlWriter)}
+
+
+def render_report(metrics, formats=('txt',), output_dir='output', basename='sales_report', detailed=False):
+    """Streams the report for `metrics` into every requested format in one pass.
+
+    Returns the list of paths written. Unknown formats raise ValueError
+    before any file is opened; repeated formats are rendered once.
+    """
+    formats = tuple(dict.fromkeys(formats))
+    unknown = [fmt for fmt in formats if fmt not in WRITERS]
+    if unknown:
+        raise ValueError(f"unknown report format(s): {', '.join(unknown)} "
+                         f"(expected {', '.join(WRITERS)})")
+    os.makedirs(output_dir, exist_ok=True)
+    paths = [os.path.join(output_dir, f"{basename}.{fmt}") for fmt in formats]
+    files = []
+    try:
+        writers = []
+        for fmt, path in zip(formats, paths):
+            f = open(path, 'w', encoding='utf-8', newline='')
+            files.append(f)
+            writers.append(WRITERS[fmt](f))
+
+        for w in writers:
+            w.begin(metrics)
+        for section in build_sections(metrics, detailed):
+            for w in writers:
+                w.begin_section(section)
+            if section.rows is not None:
+                for row in section.rows:
+                    for w in writers:
+                        w.write_row(section, row)
+            for w in writers:
+                w.end_section(section)
+        for w in writers:
+            w.end()
+    finally:
+        for f in files:
+            f.close()
+    return paths
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    sample = {
+        'generated': '2024-01-20 12:00:00',
+        'total_records': 3,
+        'total_revenue': 450.0,
+        'avg_order': 150.0,
+        'date_analysis': {
+            'daily_trend': {'2024-01-15': 200, '2024-01-16': 200, '2024-01-17': 50},
+            'peak_day': '2024-01-15',
+            'date_range': ('2024-01-15', '2024-01-17'),
+        },
+        'region_sales': {'North': 200, 'South': 200, 'East': 50},
+        'product_performance': {'low_performers': {'3': 50, '1': 200, '2': 200}},
+        'product_sales': {'1': 200, '2': 200, '3': 50},
+    }
+    with tempfile.TemporaryDirectory() as d:
+        for path in render_report(sample, formats=tuple(WRITERS), output_dir=d, detailed=True):
+            with open(path, encoding='utf-8') as f:
+                print(f"--- {os.path.basename(path)} ---")
+                print(f.read())